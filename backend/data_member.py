@@ -1,9 +1,12 @@
-from typing import Any, List, Tuple
+from typing import Any, List, Optional, Tuple
 import matplotlib.pyplot as plt
+from collections import OrderedDict
 from dataclasses import dataclass, asdict
 from backend.paper_similarity import get_paper_similarity
+import numpy as np
 import random
 import math
+import threading
 
 class Author:
     name: str
@@ -53,6 +56,227 @@ class SemanticNode(Node):
             self.title = "empty"
 
 
+# Layouts from previous graphs, keyed by primary node - used to warm start
+LAYOUT_CACHE_SIZE = 64
+_layout_cache = OrderedDict()
+_layout_cache_lock = threading.Lock()
+
+BARNES_HUT_MIN_NODES = 300
+
+
+def node_key(node):
+    """
+    Stable identifier for a node across OpenAlex (id) and Semantic Scholar (paperId) objects
+    """
+    return getattr(node, "paperId", None) or getattr(node, "id", None)
+
+
+def build_edge_index(nodes: List[Node]):
+    """
+    Builds the undirected citation edges between nodes of a graph.
+
+    Args:
+        nodes - Graph nodes, references read from cites_by_id or references
+    Returns:
+        edges : np.ndarray - (E, 2) array of node indices
+    """
+    index = {}
+    for i, node in enumerate(nodes):
+        key = node_key(node)
+        if key is not None:
+            index.setdefault(key, i)
+
+    edges = set()
+    for i, node in enumerate(nodes):
+        refs = getattr(node, "cites_by_id", None)
+        if refs is None:
+            refs = [r.get("paperId") for r in getattr(node, "references", None) or []
+                    if isinstance(r, dict)]
+        for ref in refs:
+            j = index.get(ref)
+            if j is not None and j != i:
+                edges.add((min(i, j), max(i, j)))
+
+    if not edges:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.array(sorted(edges), dtype=np.int64)
+
+
+def _exact_repulsion(pos, k2):
+    # All pairs - delta * k^2 / d^2 is the Fruchterman-Reingold k^2 / d along the unit vector
+    delta = pos[:, None, :] - pos[None, :, :]
+    dist2 = np.einsum("ijk,ijk->ij", delta, delta)
+    np.maximum(dist2, 1e-12, out=dist2)
+    np.fill_diagonal(dist2, np.inf)
+    return np.einsum("ijk,ij->ik", delta, k2 / dist2)
+
+
+def _barnes_hut_repulsion(pos, k2, theta, leaf_size=8):
+    n = len(pos)
+    max_depth = int(min(12, max(1, math.ceil(math.log(n / leaf_size, 4)) + 1)))
+
+    # Quadtree built level by level on integer cell coordinates of the deepest level
+    lo = pos.min(axis=0)
+    span = max(float((pos.max(axis=0) - lo).max()), 1e-9) * (1 + 1e-9)
+    side = 1 << max_depth
+    cell = np.minimum(((pos - lo) / span * side).astype(np.int64), side - 1)
+
+    levels = []
+    for depth in range(max_depth + 1):
+        shift = max_depth - depth
+        keys = ((cell[:, 0] >> shift) << depth) | (cell[:, 1] >> shift)
+        uniq, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        com = np.empty((len(uniq), 2))
+        com[:, 0] = np.bincount(inverse, weights=pos[:, 0]) / counts
+        com[:, 1] = np.bincount(inverse, weights=pos[:, 1]) / counts
+        levels.append([uniq, inverse.ravel(), counts, com, None])
+
+    # Index of each occupied child cell in the next level, -1 where the child is empty
+    for depth in range(max_depth):
+        uniq, child_uniq = levels[depth][0], levels[depth + 1][0]
+        cx, cy = uniq >> depth, uniq & ((1 << depth) - 1)
+        children = np.stack([
+            ((2 * cx + dx) << (depth + 1)) | (2 * cy + dy)
+            for dx in (0, 1) for dy in (0, 1)], axis=1)
+        found = np.minimum(np.searchsorted(child_uniq, children), len(child_uniq) - 1)
+        levels[depth][4] = np.where(child_uniq[found] == children, found, -1)
+
+    force = np.zeros((n, 2))
+
+    def accumulate(p, delta, scale):
+        force[:, 0] += np.bincount(p, weights=delta[:, 0] * scale, minlength=n)
+        force[:, 1] += np.bincount(p, weights=delta[:, 1] * scale, minlength=n)
+
+    # Frontier of (particle, cell) pairs still to be resolved, starting from the root
+    p = np.arange(n)
+    c = np.zeros(n, dtype=np.int64)
+    for depth in range(max_depth + 1):
+        uniq, inverse, counts, com, children = levels[depth]
+        size = span / (1 << depth)
+
+        delta = pos[p] - com[c]
+        dist2 = np.einsum("ij,ij->i", delta, delta)
+        far = (inverse[p] != c) & (size * size < theta * theta * dist2)
+        accumulate(p[far], delta[far], k2 * counts[c[far]] / dist2[far])
+
+        p, c = p[~far], c[~far]
+        if not len(p) or depth == max_depth:
+            break
+
+        # Open the remaining cells into their occupied children
+        child = children[c]
+        hit = child >= 0
+        p, c = np.broadcast_to(p[:, None], child.shape)[hit], child[hit]
+
+    # Leaves that could not be approximated - resolve against their particles directly
+    _, inverse, counts, _, _ = levels[max_depth]
+    order = np.argsort(inverse, kind="stable")
+    starts = np.cumsum(counts) - counts
+    repeats = counts[c]
+    offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    p = np.repeat(p, repeats)
+    q = order[np.repeat(starts[c], repeats) + offsets]
+    p, q = p[p != q], q[p != q]
+    delta = pos[p] - pos[q]
+    dist2 = np.maximum(np.einsum("ij,ij->i", delta, delta), 1e-12)
+    accumulate(p, delta, k2 / dist2)
+    return force
+
+
+def force_directed_layout(
+        n: int, edges, relevance=None, anchor: Optional[int] = 0, initial=None,
+        iterations: int = 50, theta: float = 1.2, seed: int = 0):
+    """
+    Vectorized Fruchterman-Reingold layout with Barnes-Hut repulsion for large graphs.
+
+    The anchor (primary node) is pinned at the origin and every other node is held on a
+    ring whose radius shrinks as its relevance grows, so relevance reads as distance.
+    Nodes without a relevance sit on the outermost ring. The graph forces only choose
+    where on its ring a node sits.
+
+    Args:
+        n - Number of nodes
+        edges - (E, 2) array of node indices, see build_edge_index
+        relevance - Per node relevance in [0, 1], nan for nodes without one
+        anchor - Index of the primary node, None when the primary node is not in the graph
+        initial - (n, 2) starting positions in output units, nan rows are placed fresh.
+                  Known rows only refine with small steps, and when every row is known
+                  a quarter of the iterations are run
+        iterations - Number of iterations from a cold start
+        theta - Barnes-Hut opening angle, larger is faster and coarser
+        seed - Seed for the initial placement
+    Returns:
+        positions : np.ndarray - (n, 2) positions, the ring for relevance 0 has radius 1
+    """
+    rng = np.random.default_rng(seed)
+    if n == 0:
+        return np.zeros((0, 2))
+
+    k = 1.0
+    radius = 0.5 * math.sqrt(n) * k
+    k2 = k * k
+
+    if relevance is None:
+        relevance = np.full(n, np.nan)
+    relevance = np.clip(np.asarray(relevance, dtype=float), 0.0, 1.0)
+    target = radius * (0.15 + 0.85 * (1 - np.nan_to_num(relevance, nan=0.0)))
+    if anchor is not None:
+        target[anchor] = 0.0
+
+    # Fresh nodes go on their ring at a random angle, warm nodes keep their cached place
+    angle = rng.uniform(0, 2 * np.pi, n)
+    pos = np.column_stack([target * np.cos(angle), target * np.sin(angle)])
+    known = np.zeros(n, dtype=bool)
+    if initial is not None:
+        initial = np.asarray(initial, dtype=float) * radius
+        known = ~np.isnan(initial).any(axis=1)
+        pos[known] = initial[known]
+
+    # Coincident points feel no repulsion from each other, so nudge them apart
+    _, first = np.unique(pos, axis=0, return_index=True)
+    duplicate = np.ones(n, dtype=bool)
+    duplicate[first] = False
+    pos[duplicate] += rng.normal(scale=0.05 * k, size=(int(duplicate.sum()), 2))
+
+    # Cached nodes are only refined, new nodes get the full cold schedule
+    if known.all():
+        iterations = max(1, iterations // 4)
+    temperature = np.where(known, 0.02 * radius, 0.2 * radius)
+    cooling = temperature / (iterations + 1)
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    u, v = edges[:, 0], edges[:, 1]
+
+    def project_to_rings():
+        dist = np.linalg.norm(pos, axis=1)
+        on_origin = dist < 1e-9
+        pos[:] = pos * (target / np.where(on_origin, 1.0, dist))[:, None]
+        pos[on_origin] = np.column_stack(
+            [np.cos(angle[on_origin]), np.sin(angle[on_origin])]) * target[on_origin, None]
+
+    project_to_rings()
+    for _ in range(iterations):
+        if n >= BARNES_HUT_MIN_NODES:
+            disp = _barnes_hut_repulsion(pos, k2, theta)
+        else:
+            disp = _exact_repulsion(pos, k2)
+
+        # Springs along citations - d^2 / k along the unit vector
+        delta = pos[u] - pos[v]
+        spring = delta * (np.sqrt(np.einsum("ij,ij->i", delta, delta)) / k)[:, None]
+        disp[:, 0] += np.bincount(v, weights=spring[:, 0], minlength=n) - np.bincount(
+            u, weights=spring[:, 0], minlength=n)
+        disp[:, 1] += np.bincount(v, weights=spring[:, 1], minlength=n) - np.bincount(
+            u, weights=spring[:, 1], minlength=n)
+
+        length = np.maximum(np.linalg.norm(disp, axis=1), 1e-9)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        project_to_rings()
+        temperature = temperature - cooling
+
+    return pos / radius
+
+
 class Graph:
 
     def __init__(self, nodes: List[Node], primary_node: Node, search_query: str):
@@ -60,6 +284,7 @@ class Graph:
         self.positions = [(0,0) for i in range(len(nodes))]
         self.primary_node = primary_node
         self.search_query = search_query
+        self.edges = None
 
     def weigh_nodes(self):
 
@@ -90,18 +315,56 @@ class Graph:
             node.relevance = random.random()
         return
 
+    def compute_layout(self, iterations: int = 50):
+        """
+        Computes node positions server side, warm starting from the cached layout of
+        any earlier graph around the same primary node.
+        Sets Graph.positions and Node.position, in units where the relevance 0 ring has radius 1
+        """
+        keys = [node_key(node) for node in self.nodes]
+        anchor = next(
+            (i for i, node in enumerate(self.nodes) if node is self.primary_node), None)
+        primary_key = node_key(self.primary_node)
+
+        cached = {}
+        if primary_key is not None:
+            with _layout_cache_lock:
+                cached = _layout_cache.get(primary_key, {})
+        initial = np.array(
+            [cached.get(key, (np.nan, np.nan)) for key in keys], dtype=float).reshape(-1, 2)
+        relevance = [getattr(node, "relevance", np.nan) for node in self.nodes]
+
+        self.edges = build_edge_index(self.nodes)
+        positions = force_directed_layout(
+            len(self.nodes), self.edges, relevance=relevance, anchor=anchor,
+            initial=initial, iterations=iterations)
+
+        self.positions = [(float(x), float(y)) for x, y in positions]
+        for node, position in zip(self.nodes, self.positions):
+            node.position = position
+
+        if primary_key is not None:
+            layout = {
+                key: position for key, position in zip(keys, self.positions)
+                if key is not None}
+            with _layout_cache_lock:
+                _layout_cache[primary_key] = layout
+                _layout_cache.move_to_end(primary_key)
+                while len(_layout_cache) > LAYOUT_CACHE_SIZE:
+                    _layout_cache.popitem(last=False)
+
+        return self.positions
+
     def visualise_static(self):
-        positions = []
-        edges = [[(node.id, k.id) for k in node.cites_by_ids] for node in self.nodes]
+        positions = np.array(self.compute_layout())
 
-        for node, (x, y) in positions.items():
-            plt.scatter(x, y, s=100)
-            plt.text(x + 0.1, y + 0.1, node)
+        for start, end in self.edges:
+            plt.plot(positions[[start, end], 0], positions[[start, end], 1], 'k-',
+                     linewidth=0.5, zorder=1)
 
-        for start, end in edges:
-            x_values = [positions[start][0], positions[end][0]]
-            y_values = [positions[start][1], positions[end][1]]
-            plt.plot(x_values, y_values, 'k-')
+        plt.scatter(positions[:, 0], positions[:, 1], s=100, zorder=2)
+        for node, (x, y) in zip(self.nodes, self.positions):
+            plt.text(x + 0.01, y + 0.01, node_key(node))
 
         plt.axis('equal')
         plt.grid(True)
@@ -140,6 +403,8 @@ class Graph:
             """
             return node.__dict__
 
+        self.compute_layout()
+
         return {
             "search_query": self.search_query,
             "primary_node_id": self.primary_node.title,
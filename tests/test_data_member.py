@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from backend import data_member
+from backend.data_member import (
+    Graph, SemanticNode, _barnes_hut_repulsion, _exact_repulsion, force_directed_layout)
+
+
+@pytest.fixture(autouse=True)
+def clear_layout_cache():
+    data_member._layout_cache.clear()
+    yield
+    data_member._layout_cache.clear()
+
+
+def star_graph(prefix, n, seed=0):
+    # Primary node citing every other node, plus random citations between references
+    rng = np.random.default_rng(seed)
+    nodes = [SemanticNode({
+        "paperId": f"{prefix}0", "title": "primary",
+        "references": [{"paperId": f"{prefix}{i}"} for i in range(1, n)]})]
+    for i in range(1, n):
+        node = SemanticNode({
+            "paperId": f"{prefix}{i}", "title": f"paper {i}",
+            "references": [{"paperId": f"{prefix}{j}"} for j in rng.integers(1, n, 2)]})
+        node.relevance = float(rng.random())
+        nodes.append(node)
+    return nodes
+
+
+def test_barnes_hut_matches_exact_repulsion():
+    pos = np.random.default_rng(0).normal(size=(1000, 2)) * 10
+    exact = _exact_repulsion(pos, 1.0)
+    mean_force = np.linalg.norm(exact, axis=1).mean()
+
+    approx = _barnes_hut_repulsion(pos, 1.0, theta=1.2)
+    assert np.linalg.norm(exact - approx) / np.linalg.norm(exact) < 0.03
+    assert np.linalg.norm(exact - approx, axis=1).max() < 0.1 * mean_force
+
+    approx = _barnes_hut_repulsion(pos, 1.0, theta=0.5)
+    assert np.linalg.norm(exact - approx) / np.linalg.norm(exact) < 0.005
+
+
+def test_relevance_sets_distance_from_anchor():
+    for n in (40, 2000):
+        nodes = star_graph(f"R{n}_", n, seed=n)
+        graph = Graph(nodes, nodes[0], "query")
+        positions = np.array(graph.compute_layout())
+
+        assert tuple(positions[0]) == (0.0, 0.0)
+        radius = np.linalg.norm(positions[1:], axis=1)
+        relevance = np.array([node.relevance for node in nodes[1:]])
+        np.testing.assert_allclose(radius, 0.15 + 0.85 * (1 - relevance), atol=1e-9)
+
+
+def mean_edge_length(positions, edges, rows):
+    lengths = np.linalg.norm(positions[edges[:, 0]] - positions[edges[:, 1]], axis=1)
+    return lengths[np.isin(edges, rows).any(axis=1)].mean()
+
+
+def test_warm_start_reuses_cached_positions():
+    nodes = star_graph("W_", 60)
+    first = Graph(nodes, nodes[0], "query").compute_layout()
+
+    # Fresh node objects for the same papers, as a new request would build
+    updated = star_graph("W_", 60)
+    second = Graph(updated, updated[0], "query").compute_layout()
+
+    moved = np.linalg.norm(np.array(second) - np.array(first), axis=1)
+    assert np.median(moved) < 0.05
+
+
+def test_warm_start_places_new_nodes_near_their_neighbours():
+    # Grow a cached 250 node graph to 400, the new papers citing the cached ones
+    n_old, n_new = 250, 400
+    nodes = star_graph("G_", n_new, seed=1)
+    Graph(nodes[:n_old], nodes[0], "query").compute_layout()
+
+    graph = Graph(nodes, nodes[0], "query")
+    positions = np.array(graph.compute_layout())
+    new_rows = np.arange(n_old, n_new)
+    edges = graph.edges[(graph.edges[:, 0] != 0) & (graph.edges[:, 1] != 0)]
+
+    random_start = force_directed_layout(
+        n_new, edges, relevance=[0.0] + [node.relevance for node in nodes[1:]],
+        iterations=0)
+    assert mean_edge_length(positions, edges, new_rows) < 0.85 * mean_edge_length(
+        random_start, edges, new_rows)
+
+
+def test_graph_without_primary_node_keeps_every_relevance():
+    nodes = star_graph("A_", 30)[1:]
+    primary = SemanticNode({"paperId": "A_primary", "title": "primary"})
+    positions = np.array(Graph(nodes, primary, "query").compute_layout())
+
+    relevance = np.array([node.relevance for node in nodes])
+    np.testing.assert_allclose(
+        np.linalg.norm(positions, axis=1), 0.15 + 0.85 * (1 - relevance), atol=1e-9)
+
+
+def test_nodes_without_relevance_sit_on_the_outer_ring():
+    nodes = star_graph("N_", 30)
+    for node in nodes[1:4]:
+        del node.relevance
+    nodes[4].relevance = None
+    positions = np.array(Graph(nodes, nodes[0], "query").compute_layout())
+
+    np.testing.assert_allclose(np.linalg.norm(positions[1:5], axis=1), 1.0)
+    assert np.linalg.norm(positions, axis=1).max() <= 1.0 + 1e-9
+
+
+def test_get_json_ships_positions():
+    nodes = star_graph("J_", 20)
+    graph = Graph(nodes, nodes[0], "query")
+    result = graph.get_json()
+
+    assert [tuple(node["position"]) for node in result["nodes"]] == graph.positions
+
+
+def test_layout_of_empty_and_single_node_graphs():
+    assert force_directed_layout(0, []).shape == (0, 2)
+    np.testing.assert_array_equal(force_directed_layout(1, []), [[0.0, 0.0]])
+
+
+def test_duplicate_paper_ids_are_separated():
+    nodes = star_graph("D_", 20)
+    duplicate = SemanticNode({"paperId": "D_5", "title": "paper 5 again"})
+    duplicate.relevance = nodes[5].relevance
+    nodes.append(duplicate)
+    Graph(nodes, nodes[0], "query").compute_layout()
+
+    # The second layout starts both copies from the same cached position
+    positions = np.array(Graph(nodes, nodes[0], "query").compute_layout())
+    assert np.linalg.norm(positions[5] - positions[-1]) > 1e-3